@@ -1,19 +1,75 @@
 import json
 import random
+import hashlib
 import os
+import re
+import sys
+from collections import Counter, defaultdict
 from datetime import datetime, timedelta
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library
+    orjson = None
+
+# Review intervals in days, keyed by difficulty level
+_INTERVALS = {1: 7, 2: 5, 3: 3, 4: 2, 5: 1}
+_INTERVAL_DELTAS = {diff: timedelta(days=days) for diff, days in _INTERVALS.items()}
+_DEFAULT_DIFFICULTY = 5  # Unknown difficulty levels use the shortest interval
+
+_ORDER_FILE = "order.json"  # Deck file names in menu order, inside the data directory
+
+
+def _review_cutoffs(now):
+    """Map each difficulty to the latest review time that makes a card due"""
+    return {diff: now - interval for diff, interval in _INTERVAL_DELTAS.items()}
+
+
+def _to_timestamp(dt):
+    """Store datetimes as integer Unix timestamps"""
+    return int(dt.timestamp())
+
+
+def _from_timestamp(value):
+    # Older data files store ISO 8601 strings
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return datetime.fromtimestamp(value)
+
+
+def _deck_filename(name):
+    """File name for a deck; the hash keeps names that slugify alike apart"""
+    slug = re.sub(r'[^\w-]+', '_', name).strip('_')[:40] or 'deck'
+    digest = hashlib.sha1(name.encode('utf-8')).hexdigest()[:8]
+    return f"{slug}-{digest}.json"
+
+
+if orjson is not None:
+    _loads = orjson.loads
+
+    def _dumps(data):
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+else:
+    _loads = json.loads
+
+    def _dumps(data):
+        return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
 
 class Flashcard:
+    __slots__ = ('front', 'back', 'tags', 'difficulty', 'last_reviewed',
+                 'review_count', 'correct_count', 'created_date', '_success_rate')
+
     def __init__(self, front, back, tags=None, difficulty=1):
         self.front = front  # Front side (question/term)
         self.back = back  # Back side (answer/definition)
-        self.tags = tags or []
+        self.tags = frozenset(tags) if tags else frozenset()
         self.difficulty = difficulty  # Difficulty level 1-5
         self.last_reviewed = None
         self.review_count = 0
         self.correct_count = 0
         self.created_date = datetime.now()
+        self._success_rate = 0  # Cached by _update_success_rate()
 
     def update_review(self, is_correct):
         """Update review record"""
@@ -28,31 +84,44 @@ class Flashcard:
             # Increase difficulty when answered incorrectly
             if self.difficulty < 5:
                 self.difficulty += 1
+        self._update_success_rate()
 
-    def get_success_rate(self):
+    def _update_success_rate(self):
         if self.review_count == 0:
-            return 0
-        return (self.correct_count / self.review_count) * 100
+            self._success_rate = 0
+        else:
+            self._success_rate = (self.correct_count / self.review_count) * 100
+
+    def get_success_rate(self):
+        return self._success_rate
 
     def needs_review(self):
         if self.last_reviewed is None:
             return True
 
         # Set review intervals based on difficulty level
-        intervals = {1: 7, 2: 5, 3: 3, 4: 2, 5: 1}  # days
-        interval_days = intervals.get(self.difficulty, 1)
-
-        return datetime.now() - self.last_reviewed >= timedelta(days=interval_days)
+        interval = _INTERVAL_DELTAS.get(self.difficulty, _INTERVAL_DELTAS[_DEFAULT_DIFFICULTY])
+        return datetime.now() - self.last_reviewed >= interval
 
 
 class FlashcardDeck:
+    __slots__ = ('name', 'cards', '_dirty', '_stats_dirty', '_cached_stats', '_stats_expiry', '_by_tag')
+
     def __init__(self, name):
         self.name = name
         self.cards = []
+        self._dirty = True  # Unsaved changes; new decks have never been written
+        self._stats_dirty = True
+        self._cached_stats = None
+        self._stats_expiry = None
+        self._by_tag = defaultdict(list)  # Tag -> cards carrying it
 
     def add_card(self, front, back, tags=None, difficulty=1):
         card = Flashcard(front, back, tags, difficulty)
         self.cards.append(card)
+        self._index_card(card, card.tags)
+        self._stats_dirty = True
+        self._dirty = True
         return len(self.cards) - 1  # Return new card index
 
     def edit_card(self, index, front=None, back=None, tags=None):
@@ -63,35 +132,114 @@ class FlashcardDeck:
             if back is not None:
                 card.back = back
             if tags is not None:
-                card.tags = tags
+                new_tags = frozenset(tags)
+                self._unindex_card(card, card.tags - new_tags)
+                self._index_card(card, new_tags - card.tags)
+                card.tags = new_tags
+            self._stats_dirty = True
+            self._dirty = True
             return True
         return False
 
     def remove_card(self, index):
         if 0 <= index < len(self.cards):
-            removed = self.cards.pop(index)
+            # Card order doesn't matter, so fill the gap with the last card
+            # instead of shifting everything after it
+            last = self.cards.pop()
+            if index < len(self.cards):
+                removed = self.cards[index]
+                self.cards[index] = last
+            else:
+                removed = last
+            self._unindex_card(removed, removed.tags)
+            self._stats_dirty = True
+            self._dirty = True
             return removed
         return None
 
+    def update_review(self, card, is_correct):
+        """Record a review of one of this deck's cards"""
+        card.update_review(is_correct)
+        self._stats_dirty = True
+        self._dirty = True
+
+    def compute_stats(self):
+        """Return (due, difficult) card lists, computed in a single pass"""
+        now = datetime.now()
+        # Cached lists stay valid until a card changes or the next card falls due
+        if not self._stats_dirty and now < self._stats_expiry:
+            return self._cached_stats
+
+        thresholds = _review_cutoffs(now)
+        default = thresholds[_DEFAULT_DIFFICULTY]
+        due = []
+        difficult = []
+        oldest = {}  # Earliest review among learned cards, per difficulty
+        for card in self.cards:
+            reviewed = card.last_reviewed
+            if reviewed is None or reviewed <= thresholds.get(card.difficulty, default):
+                due.append(card)
+            elif reviewed < oldest.get(card.difficulty, datetime.max):
+                oldest[card.difficulty] = reviewed
+            if card.difficulty >= 4:
+                difficult.append(card)
+
+        self._cached_stats = (due, difficult)
+        self._stats_expiry = min(
+            (reviewed + _INTERVAL_DELTAS.get(diff, _INTERVAL_DELTAS[_DEFAULT_DIFFICULTY])
+             for diff, reviewed in oldest.items()),
+            default=datetime.max
+        )
+        self._stats_dirty = False
+        return self._cached_stats
+
+    def _index_card(self, card, tags):
+        for tag in tags:
+            self._by_tag[tag].append(card)
+
+    def _unindex_card(self, card, tags):
+        for tag in tags:
+            tagged = self._by_tag[tag]
+            tagged.remove(card)
+            if not tagged:
+                del self._by_tag[tag]
+
+    def _rebuild_index(self):
+        """Rebuild the tag index after self.cards was replaced directly"""
+        self._by_tag = defaultdict(list)
+        for card in self.cards:
+            self._index_card(card, card.tags)
+        self._stats_dirty = True
+
+    def tag_counts(self):
+        """Return a Counter of how many cards carry each tag"""
+        return Counter({tag: len(tagged) for tag, tagged in self._by_tag.items()})
+
     def get_cards_for_review(self):
-        return [card for card in self.cards if card.needs_review()]
+        return list(self.compute_stats()[0])
 
     def get_difficult_cards(self):
-        return [card for card in self.cards if card.difficulty >= 4]
+        return list(self.compute_stats()[1])
 
     def get_cards_by_tag(self, tag):
-        return [card for card in self.cards if tag in card.tags]
+        return list(self._by_tag.get(tag, ()))
 
 
 class FlashcardStudySystem:
     def __init__(self):
         self.decks = {}
-        self.data_file = "flashcards_data.json"
+        self.data_dir = "flashcards_data"  # One JSON file per deck
+        self.data_file = "flashcards_data.json"  # Single-file format used by older versions
+        self._removed_files = set()  # Deck files to delete on the next save
+        self._deck_names_cache = None  # Deck names in menu order; reset when decks change
+        self._order_dirty = False  # Deck order changed since the last save
         self.load_data()
 
     def create_sample_deck(self):
         if "English Vocabulary" not in self.decks:
             self.decks["English Vocabulary"] = FlashcardDeck("English Vocabulary")
+            self._deck_names_cache = None
+            self._order_dirty = True
             deck = self.decks["English Vocabulary"]
 
             sample_cards = [
@@ -107,8 +255,8 @@ class FlashcardStudySystem:
                 ("accompany", "to go with someone", ["verb", "intermediate"])
             ]
 
-            for front, back, tags in sample_cards:
-                deck.add_card(front, back, tags)
+            deck.cards.extend(Flashcard(front, back, tags) for front, back, tags in sample_cards)
+            deck._rebuild_index()
 
     def main_menu(self):
         while True:
@@ -119,14 +267,17 @@ class FlashcardStudySystem:
             if not self.decks:
                 print("No decks available. Create one to start studying!")
                 print("1. Create Deck")
+                print("2. Load Sample Deck (English Vocabulary)")
                 print("0. Exit")
             else:
-                print("Available Decks:")
+                lines = ["Available Decks:"]
                 for i, (name, deck) in enumerate(self.decks.items(), 1):
                     card_count = len(deck.cards)
-                    need_review = len(deck.get_cards_for_review())
-                    difficult = len(deck.get_difficult_cards())
-                    print(f"{i}. {name} ({card_count} cards, {need_review} due, {difficult} difficult)")
+                    due, difficult_cards = deck.compute_stats()
+                    need_review = len(due)
+                    difficult = len(difficult_cards)
+                    lines.append(f"{i}. {name} ({card_count} cards, {need_review} due, {difficult} difficult)")
+                sys.stdout.write("\n".join(lines) + "\n")
 
                 print(f"\n{len(self.decks) + 1}. Create New Deck")
                 print("0. Exit")
@@ -139,12 +290,15 @@ class FlashcardStudySystem:
                 break
             elif choice == str(len(self.decks) + 1):
                 self.create_deck_menu()
+            elif choice == '2' and not self.decks:
+                self.create_sample_deck()
             else:
                 try:
                     deck_index = int(choice) - 1
-                    deck_names = list(self.decks.keys())
-                    if 0 <= deck_index < len(deck_names):
-                        self.deck_menu(deck_names[deck_index])
+                    if 0 <= deck_index < len(self.decks):
+                        if self._deck_names_cache is None:
+                            self._deck_names_cache = list(self.decks)
+                        self.deck_menu(self._deck_names_cache[deck_index])
                     else:
                         print("Invalid selection")
                 except ValueError:
@@ -156,6 +310,8 @@ class FlashcardStudySystem:
         if name:
             if name not in self.decks:
                 self.decks[name] = FlashcardDeck(name)
+                self._deck_names_cache = None
+                self._order_dirty = True
                 print(f"Created deck: {name}")
             else:
                 print("Deck already exists")
@@ -170,8 +326,9 @@ class FlashcardStudySystem:
             print(f"Total Cards: {len(deck.cards)}")
 
             if deck.cards:
-                need_review = len(deck.get_cards_for_review())
-                difficult = len(deck.get_difficult_cards())
+                due, difficult_cards = deck.compute_stats()
+                need_review = len(due)
+                difficult = len(difficult_cards)
                 print(f"Due for Review: {need_review}")
                 print(f"Difficult Cards: {difficult}")
 
@@ -202,8 +359,9 @@ class FlashcardStudySystem:
         while True:
             print(f"\n--- Study {deck.name} ---")
 
-            need_review = len(deck.get_cards_for_review())
-            difficult = len(deck.get_difficult_cards())
+            due, difficult_cards = deck.compute_stats()
+            need_review = len(due)
+            difficult = len(difficult_cards)
             total = len(deck.cards)
 
             print(f"1. Review Due Cards ({need_review} cards)")
@@ -228,18 +386,16 @@ class FlashcardStudySystem:
                 print("Invalid selection")
 
     def study_by_tag_menu(self, deck):
-        all_tags = set()
-        for card in deck.cards:
-            all_tags.update(card.tags)
+        all_tags = deck.tag_counts()
 
         if not all_tags:
             print("No tagged cards found")
             return
 
-        tags = sorted(list(all_tags))
+        tags = sorted(all_tags)
         print(f"\n--- Study by Tag ---")
         for i, tag in enumerate(tags, 1):
-            count = len([c for c in deck.cards if tag in c.tags])
+            count = all_tags[tag]
             print(f"{i}. {tag} ({count} cards)")
 
         print("0. Back")
@@ -318,7 +474,7 @@ class FlashcardStudySystem:
                 print(f"\nEditing Card #{index + 1}")
                 print(f"Current Front: {card.front}")
                 print(f"Current Back: {card.back}")
-                print(f"Current Tags: {', '.join(card.tags)}")
+                print(f"Current Tags: {', '.join(sorted(card.tags))}")
 
                 front = input("New Front (press Enter to keep current): ").strip()
                 back = input("New Back (press Enter to keep current): ").strip()
@@ -382,7 +538,11 @@ class FlashcardStudySystem:
             if new_name not in self.decks:
                 deck = self.decks.pop(old_name)
                 deck.name = new_name
+                deck._dirty = True
                 self.decks[new_name] = deck
+                self._deck_names_cache = None
+                self._order_dirty = True
+                self._removed_files.add(self._deck_path(old_name))
                 print(f"Deck renamed to: {new_name}")
             else:
                 print("Name already exists")
@@ -395,6 +555,9 @@ class FlashcardStudySystem:
         confirm = input("Delete entire deck? This cannot be undone! (type 'DELETE' to confirm): ").strip()
         if confirm == 'DELETE':
             del self.decks[deck_name]
+            self._deck_names_cache = None
+            self._order_dirty = True
+            self._removed_files.add(self._deck_path(deck_name))
             print("Deck deleted")
             return True
         else:
@@ -403,19 +566,20 @@ class FlashcardStudySystem:
 
     def start_study_session(self, deck, mode, custom_cards=None):
         if custom_cards is not None:
-            cards = custom_cards
+            source = custom_cards
         elif mode == "review":
-            cards = deck.get_cards_for_review()
+            source = deck.compute_stats()[0]
         elif mode == "difficult":
-            cards = deck.get_difficult_cards()
+            source = deck.compute_stats()[1]
         else:  # all
-            cards = deck.cards.copy()
+            source = deck.cards
 
-        if not cards:
+        if not source:
             print("No cards match the criteria!")
             return
 
-        random.shuffle(cards)
+        # Shuffled copy in one step, so the source list needn't be copied first
+        cards = random.sample(source, len(source))
         correct = 0
         total = len(cards)
 
@@ -425,7 +589,7 @@ class FlashcardStudySystem:
         for i, card in enumerate(cards, 1):
             print(f"\nCard {i}/{total}")
             if card.tags:
-                print(f"Tags: {', '.join(card.tags)}")
+                print(f"Tags: {', '.join(sorted(card.tags))}")
             print(f"Question: {card.front}")
 
             input("Press Enter to reveal answer...")
@@ -434,12 +598,12 @@ class FlashcardStudySystem:
             while True:
                 response = input("Did you get it right? (y/n/q to quit): ").lower().strip()
                 if response in ['y', 'yes']:
-                    card.update_review(True)
+                    deck.update_review(card, True)
                     correct += 1
                     print("Great! ✓")
                     break
                 elif response in ['n', 'no']:
-                    card.update_review(False)
+                    deck.update_review(card, False)
                     print("Keep practicing! ✗")
                     break
                 elif response in ['q', 'quit']:
@@ -465,14 +629,17 @@ class FlashcardStudySystem:
             print("Deck is empty")
             return
 
-        print(f"\n--- {deck.name} Card List ---")
+        due = set(deck.compute_stats()[0])
+        # Collect the whole listing and write it at once rather than per line
+        lines = [f"\n--- {deck.name} Card List ---"]
         for i, card in enumerate(deck.cards):
             prefix = f"{i + 1}. " if show_index else "• "
-            status = "Due" if card.needs_review() else "Learned"
-            tags_str = f" [{', '.join(card.tags)}]" if card.tags else ""
+            status = "Due" if card in due else "Learned"
+            tags_str = f" [{', '.join(sorted(card.tags))}]" if card.tags else ""
 
-            print(f"{prefix}{card.front} -> {card.back}{tags_str}")
-            print(f"   Difficulty: {card.difficulty}/5 | Success Rate: {card.get_success_rate():.1f}% | {status}")
+            lines.append(f"{prefix}{card.front} -> {card.back}{tags_str}\n"
+                         f"   Difficulty: {card.difficulty}/5 | Success Rate: {card.get_success_rate():.1f}% | {status}")
+        sys.stdout.write("\n".join(lines) + "\n")
 
     def show_statistics(self, deck):
         cards = deck.cards
@@ -481,19 +648,21 @@ class FlashcardStudySystem:
             return
 
         total_cards = len(cards)
-        reviewed_cards = len([c for c in cards if c.review_count > 0])
-        need_review = len(deck.get_cards_for_review())
-        difficult_cards = len(deck.get_difficult_cards())
-
-        total_reviews = sum(c.review_count for c in cards)
-        total_correct = sum(c.correct_count for c in cards)
+        due, difficult = deck.compute_stats()
+        need_review = len(due)
+        difficult_cards = len(difficult)
+
+        # Gather the remaining review counts in a single pass
+        reviewed_cards = total_reviews = total_correct = 0
+        for c in cards:
+            if c.review_count > 0:
+                reviewed_cards += 1
+                total_reviews += c.review_count
+                total_correct += c.correct_count
         overall_accuracy = (total_correct / total_reviews * 100) if total_reviews > 0 else 0
 
         # Tag statistics
-        all_tags = {}
-        for card in cards:
-            for tag in card.tags:
-                all_tags[tag] = all_tags.get(tag, 0) + 1
+        all_tags = deck.tag_counts()
 
         print(f"\n=== {deck.name} Statistics ===")
         print(f"Total Cards: {total_cards}")
@@ -504,60 +673,130 @@ class FlashcardStudySystem:
         print(f"Overall Accuracy: {overall_accuracy:.1f}%")
 
         if all_tags:
-            print(f"\nTag Distribution:")
-            for tag, count in sorted(all_tags.items()):
-                print(f"  {tag}: {count} cards")
+            lines = ["\nTag Distribution:"]
+            lines.extend(f"  {tag}: {count} cards" for tag, count in sorted(all_tags.items()))
+            sys.stdout.write("\n".join(lines) + "\n")
+
+    def _deck_path(self, deck_name):
+        return os.path.join(self.data_dir, _deck_filename(deck_name))
+
+    @staticmethod
+    def _write_file(path, data):
+        # Write to a temporary file first so a crash never leaves a torn data file
+        tmp_file = path + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.write(_dumps(data))
+        os.replace(tmp_file, path)
 
     def save_data(self):
-        data = {}
-        for name, deck in self.decks.items():
-            data[name] = []
-            for card in deck.cards:
-                card_data = {
+        """Write decks changed since the last save and drop files of removed decks"""
+        dirty_decks = [deck for deck in self.decks.values() if deck._dirty]
+        if not dirty_decks and not self._removed_files and not self._order_dirty:
+            return
+
+        os.makedirs(self.data_dir, exist_ok=True)
+        for deck in dirty_decks:
+            self._save_deck(deck)
+            deck._dirty = False
+
+        # Deck files are unordered, so keep the menu order in a separate index
+        if self._order_dirty:
+            order = [_deck_filename(name) for name in self.decks]
+            self._write_file(os.path.join(self.data_dir, _ORDER_FILE), order)
+            self._order_dirty = False
+
+        # Only remove old files once their replacements are written, and never
+        # one that now belongs to a current deck (e.g. rename A -> B, then new A)
+        current = {self._deck_path(name) for name in self.decks}
+        for path in self._removed_files - current:
+            if os.path.exists(path):
+                os.remove(path)
+        self._removed_files.clear()
+
+    def _save_deck(self, deck):
+        data = {
+            'name': deck.name,
+            'cards': [
+                {
                     'front': card.front,
                     'back': card.back,
-                    'tags': card.tags,
+                    'tags': sorted(card.tags),
                     'difficulty': card.difficulty,
                     'review_count': card.review_count,
                     'correct_count': card.correct_count,
-                    'last_reviewed': card.last_reviewed.isoformat() if card.last_reviewed else None,
-                    'created_date': card.created_date.isoformat()
+                    'last_reviewed': _to_timestamp(card.last_reviewed) if card.last_reviewed else None,
+                    'created_date': _to_timestamp(card.created_date)
                 }
-                data[name].append(card_data)
-
-        with open(self.data_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+                for card in deck.cards
+            ]
+        }
+
+        self._write_file(self._deck_path(deck.name), data)
+
+    @staticmethod
+    def _card_from_dict(card_data):
+        """Rebuild a Flashcard from its saved representation"""
+        card = Flashcard(
+            card_data['front'],
+            card_data['back'],
+            card_data.get('tags', []),
+            card_data['difficulty']
+        )
+        card.review_count = card_data['review_count']
+        card.correct_count = card_data['correct_count']
+        card._update_success_rate()
+        if card_data['last_reviewed']:
+            card.last_reviewed = _from_timestamp(card_data['last_reviewed'])
+        card.created_date = _from_timestamp(card_data['created_date'])
+        return card
+
+    def _load_deck(self, deck_name, cards_data):
+        deck = FlashcardDeck(deck_name)
+        deck.cards = [self._card_from_dict(card_data) for card_data in cards_data]
+        deck._rebuild_index()
+        return deck
 
     def load_data(self):
-        if os.path.exists(self.data_file):
+        if os.path.isdir(self.data_dir):
+            order = []
+            order_path = os.path.join(self.data_dir, _ORDER_FILE)
+            if os.path.exists(order_path):
+                try:
+                    with open(order_path, 'rb') as f:
+                        order = _loads(f.read())
+                except Exception as e:
+                    print(f"Error loading deck order: {e}")
+
+            # Decks missing from the order index go last, by file name
+            filenames = sorted(name for name in os.listdir(self.data_dir)
+                               if name.endswith('.json') and name != _ORDER_FILE)
+            position = {filename: i for i, filename in enumerate(order)}
+            filenames.sort(key=lambda filename: position.get(filename, len(order)))
+            if any(filename not in position for filename in filenames):
+                self._order_dirty = True
+
+            for filename in filenames:
+                try:
+                    with open(os.path.join(self.data_dir, filename), 'rb') as f:
+                        data = _loads(f.read())
+                    deck = self._load_deck(data['name'], data['cards'])
+                    deck._dirty = False
+                    self.decks[deck.name] = deck
+                except Exception as e:
+                    print(f"Error loading {filename}: {e}")
+        elif os.path.exists(self.data_file):
+            # Decks loaded from the old single file stay dirty, so the next
+            # save writes them out as per-deck files along with their order
             try:
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                with open(self.data_file, 'rb') as f:
+                    data = _loads(f.read())
 
                 for deck_name, cards_data in data.items():
-                    deck = FlashcardDeck(deck_name)
-                    for card_data in cards_data:
-                        card = Flashcard(
-                            card_data['front'],
-                            card_data['back'],
-                            card_data.get('tags', []),
-                            card_data['difficulty']
-                        )
-                        card.review_count = card_data['review_count']
-                        card.correct_count = card_data['correct_count']
-                        if card_data['last_reviewed']:
-                            card.last_reviewed = datetime.fromisoformat(card_data['last_reviewed'])
-                        card.created_date = datetime.fromisoformat(card_data['created_date'])
-                        deck.cards.append(card)
-
-                    self.decks[deck_name] = deck
+                    self.decks[deck_name] = self._load_deck(deck_name, cards_data)
+                self._order_dirty = True
             except Exception as e:
                 print(f"Error loading data: {e}")
 
-        # Create sample deck if no data exists
-        if not self.decks:
-            self.create_sample_deck()
-
 
 def main():
     system = FlashcardStudySystem()